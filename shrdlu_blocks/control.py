@@ -1,6 +1,7 @@
 """The implementation of the physics of the simulated environment."""
 import logging
-from typing import Optional, Any, Dict, Iterator, Tuple
+import math
+from typing import Optional, Any, Dict, Iterator, Tuple, Set
 
 from shrdlu_blocks.geometry import Point
 from shrdlu_blocks.scenes import Scene, PhysicalObject
@@ -24,8 +25,24 @@ class Controller:
     def __init__(self, scene: Scene, grasper_distance_tolerance: float = 0.000001):
         self._scene = scene
         self._grasper_distance_tolerance = grasper_distance_tolerance
+        self._grasper_distance_tolerance_squared = grasper_distance_tolerance ** 2
         self._default_grasper: Optional[PhysicalObject] = None
         self._grasper_cache: Dict[ObjectID, PhysicalObject] = {}
+        self._grasper_bounds: Dict[ObjectID, Tuple[float, float, float, float]] = {}
+        self._obj_id_index: Dict[ObjectID, PhysicalObject] = {}
+        self._obj_order: Dict[ObjectID, int] = {}
+        # Maps each tag key to a mapping from tag values to the IDs of the objects having them.
+        # Keys are only indexed once they are searched on, and are mapped to None if any of their
+        # values are unhashable.
+        self._tag_index: Dict[str, Optional[Dict[Any, Set[ObjectID]]]] = {}
+        # The objects not currently held by any grasper, in scene order, or None if they need to be
+        # found again.
+        self._free_objects: Optional[Tuple[PhysicalObject, ...]] = None
+        self._rebuild_index()
+        # The height of the highest stable point in the scene only changes when an object is
+        # grasped or released, so it is cached between those events.
+        self._highest_stable_point = 0.0
+        self._highest_stable_point_dirty = True
 
     @property
     def default_grasper(self) -> Optional[ObjectID]:
@@ -35,7 +52,7 @@ class Controller:
         if self._default_grasper is None:
             result = None
         else:
-            result = self._default_grasper.tags.get('obj_id', None)
+            result = self._default_grasper.obj_id
         LOGGER.info("Query result: default_grasper == %r", result)
         return result
 
@@ -46,17 +63,32 @@ class Controller:
         LOGGER.info("Action: default_grasper = %r", grasper_id)
         self._default_grasper = self._require_grasper(grasper_id)
 
+    @property
+    def object_count(self) -> int:
+        """The number of objects in the scene which have object IDs."""
+        LOGGER.info("Query: object_count?")
+        result = len(self._obj_id_index)
+        LOGGER.info("Query result: object_count == %r", result)
+        return result
+
     def grasper_is_closed(self, grasper_id: ObjectID = None) -> bool:
         """Query whether the grasper is closed. Returns a boolean value."""
         LOGGER.info("Query: grasper_is_closed(grasper_id=%r)?", grasper_id)
-        result = self._require_grasper(grasper_id).tags.get('closed', False)
+        # These queries are often polled, so the default grasper is read directly when possible.
+        grasper = self._default_grasper if grasper_id is None else None
+        if grasper is None:
+            grasper = self._require_grasper(grasper_id)
+        result = grasper.tags.get('closed', False)
         LOGGER.info("Query result: grasper_is_closed(grasper_id=%r) == %r", grasper_id, result)
         return result
 
     def grasper_is_lowered(self, grasper_id: ObjectID = None) -> bool:
         """Query whether the grasper is lowered. Returns a boolean value."""
         LOGGER.info("Query: grasper_is_lowered(grasper_id=%r)?", grasper_id)
-        result = self._require_grasper(grasper_id).tags.get('lowered', False)
+        grasper = self._default_grasper if grasper_id is None else None
+        if grasper is None:
+            grasper = self._require_grasper(grasper_id)
+        result = grasper.tags.get('lowered', False)
         LOGGER.info("Query result: grasper_is_lowered(grasper_id=%r) == %r", grasper_id, result)
         return result
 
@@ -65,7 +97,10 @@ class Controller:
         object ID of the grasped object, or None if no object is currently
         grasped."""
         LOGGER.info("Query: get_grasped_object(grasper_id=%r)?", grasper_id)
-        result = self._require_grasper(grasper_id).tags.get('grasped', None)
+        grasper = self._default_grasper if grasper_id is None else None
+        if grasper is None:
+            grasper = self._require_grasper(grasper_id)
+        result = grasper.tags.get('grasped', None)
         LOGGER.info("Query result: get_grasped_object(grasper_id=%r) == %r", grasper_id, result)
         return result
 
@@ -76,18 +111,20 @@ class Controller:
         LOGGER.info("Action: close_grasper(grasper_id=%r)", grasper_id)
         grasper = self._require_grasper(grasper_id)
         del grasper_id
-        if grasper.tags.get('closed', False):
+        grasper_tags = grasper.tags
+        if grasper_tags.get('closed', False):
             raise UnmetConditionError('Grasper is not open.')
-        if grasper.tags.get('lowered', False):
+        if grasper_tags.get('lowered', False):
             # Find out if the grasper was lowered onto a graspable object.
             # If so, make it grasp the object.
-            resting_on_id = grasper.tags.get('resting_on', None)
+            resting_on_id = grasper_tags.get('resting_on', None)
             if resting_on_id:
                 resting_on = self._require_specific_object(resting_on_id)
-                if resting_on.tags.get('graspable', False):
-                    grasper.tags['grasped'] = resting_on_id
-                    resting_on.tags['grasped_by'] = grasper.tags.get('obj_id', None)
-        grasper.tags['closed'] = True
+                if resting_on.graspable:
+                    self._set_tag(grasper, 'grasped', resting_on_id)
+                    self._set_tag(resting_on, 'grasped_by', grasper.obj_id)
+                    self._highest_stable_point_dirty = True
+        self._set_tag(grasper, 'closed', True)
 
     def open_grasper(self, grasper_id: ObjectID = None) -> None:
         """Attempt to open the grasper. If the grasper is holding an object and
@@ -95,15 +132,17 @@ class Controller:
         LOGGER.info("Action: open_grasper(grasper_id=%r)", grasper_id)
         grasper = self._require_grasper(grasper_id)
         del grasper_id
-        if not grasper.tags.get('closed', False):
+        grasper_tags = grasper.tags
+        if not grasper_tags.get('closed', False):
             raise UnmetConditionError('Grasper is not closed.')
-        grasped_obj_id = grasper.tags.get('grasped', None)
+        grasped_obj_id = grasper_tags.get('grasped', None)
         if grasped_obj_id is not None:
             grasped_obj = self._require_specific_object(grasped_obj_id)
-            if not grasper.tags.get('lowered', False):
+            grasped_obj_tags = grasped_obj.tags
+            if not grasper_tags.get('lowered', False):
                 raise UnmetConditionError('Grasper must be lowered first when holding an object.')
             # If an object was grasped, we have to be above another object that can support it.
-            resting_on_id = grasped_obj.tags.get('resting_on', None)
+            resting_on_id = grasped_obj_tags.get('resting_on', None)
             if resting_on_id is None:
                 raise UnmetConditionError('Object must be lowered onto another object that can '
                                           'support it in order to be dropped.')
@@ -111,11 +150,12 @@ class Controller:
             if not resting_on.can_support(grasped_obj):
                 raise UnmetConditionError('Object must be lowered onto another object that can '
                                           'support it in order to be dropped.')
-            assert grasped_obj.tags.get('grasped_by', None) == grasper.tags.get('obj_id', None)
+            assert grasped_obj_tags.get('grasped_by', None) == grasper.obj_id
             # Let go of the object.
-            grasped_obj.tags['grasped_by'] = None
-            grasper.tags['grasped'] = None
-        grasper.tags['closed'] = False
+            self._set_tag(grasped_obj, 'grasped_by', None)
+            self._set_tag(grasper, 'grasped', None)
+            self._highest_stable_point_dirty = True
+        self._set_tag(grasper, 'closed', False)
 
     def move_grasper(self, x: float = None, y: float = None, grasper_id: ObjectID = None) -> None:
         """Attempt to move the grasper to a new (x, y) coordinate. One or both
@@ -128,22 +168,27 @@ class Controller:
             raise TypeError(y)
         grasper = self._require_grasper(grasper_id)
         del grasper_id
-        if grasper.tags.get('lowered', False):
+        grasper_tags = grasper.tags
+        if grasper_tags.get('lowered', False):
             raise UnmetConditionError('Grasper must be raised before it can be moved.')
         if x is None and y is None:
             raise UnmetConditionError('No position specified.')
-        if x is not None and not grasper.tags.get('min_x', x) <= x <= grasper.tags.get('max_x', x):
+        min_x, max_x, min_y, max_y = self._get_grasper_bounds(grasper)
+        if x is not None and not min_x <= x <= max_x:
             raise UnmetConditionError('The grasper cannot move there.')
-        if y is not None and not grasper.tags.get('min_y', y) <= y <= grasper.tags.get('max_y', y):
+        if y is not None and not min_y <= y <= max_y:
             raise UnmetConditionError('The grasper cannot move there.')
-        old_x, old_y, old_z = grasper.position
-        grasper.position = Point(old_x if x is None else x, old_y if y is None else y, old_z)
-        grasped_obj_id = grasper.tags.get('grasped', None)
+        old_position = grasper.position
+        new_x = old_position.x if x is None else x
+        new_y = old_position.y if y is None else y
+        grasper_z = old_position.z
+        grasper.position = Point(new_x, new_y, grasper_z)
+        grasped_obj_id = grasper_tags.get('grasped', None)
         if grasped_obj_id is not None:
             grasped_obj = self._require_specific_object(grasped_obj_id)
             highest_point = grasped_obj.find_highest_point()
             height = highest_point.z - grasped_obj.position.z
-            grasped_obj.position = grasper.position - Point(0, 0, height)
+            grasped_obj.position = Point(new_x, new_y, grasper_z - height)
 
     def lower_grasper(self, grasper_id: ObjectID = None) -> None:
         """Attempt to lower the grasper. The grasper will be lowered until it
@@ -154,32 +199,36 @@ class Controller:
         LOGGER.info("Action: lower_grasper(grasper_id=%r)", grasper_id)
         grasper = self._require_grasper(grasper_id)
         del grasper_id
-        if grasper.tags.get('lowered', False):
+        grasper_tags = grasper.tags
+        if grasper_tags.get('lowered', False):
             raise UnmetConditionError('Grasper is not raised.')
-        target, target_height = self._find_object_below_grasper(grasper)
-        grasped_obj_id = grasper.tags.get('grasped', None)
+        target, target_height, _ = self._sweep_scene(grasper)
+        grasper_x = grasper.position.x
+        grasper_y = grasper.position.y
+        grasped_obj_id = grasper_tags.get('grasped', None)
         if grasped_obj_id is None:
             # Set the grasper's position so that the grasper is resting on whatever object is below
             # it.
-            grasper.position = Point(grasper.position.x,
-                                     grasper.position.y,
-                                     target_height)
+            grasper.position = Point(grasper_x, grasper_y, target_height)
             if target:
-                x_displacement, y_displacement = (target.position - grasper.position)[:2]
-                distance = (x_displacement ** 2 + y_displacement ** 2) ** 0.5
-                if distance <= self._grasper_distance_tolerance:
-                    grasper.tags['resting_on'] = target.tags.get('obj_id', None)
+                target_position = target.position
+                x_displacement = target_position.x - grasper_x
+                y_displacement = target_position.y - grasper_y
+                # Compare squared distances to avoid taking a square root.
+                squared_distance = x_displacement * x_displacement + y_displacement * y_displacement
+                if squared_distance <= self._grasper_distance_tolerance_squared:
+                    self._set_tag(grasper, 'resting_on', target.obj_id)
         else:
             # Set the grasper's position so that the grasped object is resting on whatever object is
             # below it. Remember to update both the grasper's and the object's positions.
             grasped_obj = self._require_specific_object(grasped_obj_id)
             highest_point = grasped_obj.find_highest_point()
             height = highest_point.z - grasped_obj.position.z
-            grasper.position = Point(grasper.position.x, grasper.position.y, target_height + height)
-            grasped_obj.position = Point(grasper.position.x, grasper.position.y, target_height)
+            grasper.position = Point(grasper_x, grasper_y, target_height + height)
+            grasped_obj.position = Point(grasper_x, grasper_y, target_height)
             if target:
-                grasped_obj.tags['resting_on'] = target.tags.get('obj_id', None)
-        grasper.tags['lowered'] = True
+                self._set_tag(grasped_obj, 'resting_on', target.obj_id)
+        self._set_tag(grasper, 'lowered', True)
 
     def raise_grasper(self, grasper_id: ObjectID = None) -> None:
         """Attempt to raise the grasper. The grasper will be raised until it
@@ -188,20 +237,23 @@ class Controller:
         LOGGER.info("Action: raise_grasper(grasper_id=%r)", grasper_id)
         grasper = self._require_grasper(grasper_id)
         del grasper_id
-        if not grasper.tags.get('lowered', False):
+        grasper_tags = grasper.tags
+        if not grasper_tags.get('lowered', False):
             raise UnmetConditionError('Grasper is not lowered.')
         minimum_height = self._find_highest_stable_point() + 0.1
-        grasped_obj_id = grasper.tags.get('grasped', None)
+        grasper_x = grasper.position.x
+        grasper_y = grasper.position.y
+        grasped_obj_id = grasper_tags.get('grasped', None)
         if grasped_obj_id is None:
-            grasper.position = Point(grasper.position.x, grasper.position.y, minimum_height)
-            grasper.tags['resting_on'] = None
+            grasper.position = Point(grasper_x, grasper_y, minimum_height)
+            self._set_tag(grasper, 'resting_on', None)
         else:
             grasped_obj = self._require_specific_object(grasped_obj_id)
-            grasped_obj.position = Point(grasper.position.x, grasper.position.y, minimum_height)
+            grasped_obj.position = Point(grasper_x, grasper_y, minimum_height)
             highest_point = grasped_obj.find_highest_point()
-            grasper.position = Point(grasper.position.x, grasper.position.y, highest_point.z)
-            grasped_obj.tags['resting_on'] = None
-        grasper.tags['lowered'] = False
+            grasper.position = Point(grasper_x, grasper_y, highest_point.z)
+            self._set_tag(grasped_obj, 'resting_on', None)
+        self._set_tag(grasper, 'lowered', False)
 
     def find_objects(self, **tags) -> Iterator[ObjectID]:
         """Query the objects in the scene. An iterator will be returned over
@@ -209,8 +261,29 @@ class Controller:
         arguments exactly. If no keyword arguments are provided, an iterator
         over all objects in the scene will be returned."""
         LOGGER.info("Query: find_objects(**%r)?", tags)
-        for obj in self._scene.find_objects(**tags):
-            obj_id = obj.tags.get('obj_id', None)
+        # Use the tag index to find the smallest set of candidates matching any one of the tags.
+        candidates = None
+        for key, value in tags.items():
+            index = self._get_tag_index(key)
+            if index is None:
+                continue
+            try:
+                matches = index.get(value, ())
+            except TypeError:
+                # The value is unhashable, so it can't be looked up in the index.
+                continue
+            if candidates is None or len(matches) < len(candidates):
+                candidates = matches
+        if candidates is None:
+            objects = self._scene.find_objects(**tags)
+        else:
+            # Check the remaining tags directly, and preserve the order of the objects in the scene.
+            objects = (self._obj_id_index[obj_id]
+                       for obj_id in sorted(candidates, key=self._obj_order.__getitem__))
+            objects = (obj for obj in objects
+                       if all(obj.tags.get(key, None) == value for key, value in tags.items()))
+        for obj in objects:
+            obj_id = obj.obj_id
             if obj_id is not None:
                 LOGGER.info("Query result item: %r in find_objects(**%r)", obj_id, tags)
                 yield obj_id
@@ -243,40 +316,126 @@ class Controller:
         LOGGER.info("Action: highlight_object(obj_id=%r, color=%r)", obj_id, color)
         if color is not None and not isinstance(color, Color):
             color = Color(*color)
-        self._require_specific_object(obj_id).tags['highlight'] = True
-        self._require_specific_object(obj_id).tags['highlight_color'] = color
+        obj = self._require_specific_object(obj_id)
+        self._set_tag(obj, 'highlight', True)
+        self._set_tag(obj, 'highlight_color', color)
 
     def unhighlight_object(self, obj_id: ObjectID) -> None:
         """Remove an object's highlighting."""
         LOGGER.info("Action: unhighlight_object(obj_id=%r)", obj_id)
-        self._require_specific_object(obj_id).tags['highlight'] = False
-        self._require_specific_object(obj_id).tags['highlight_color'] = None
+        obj = self._require_specific_object(obj_id)
+        self._set_tag(obj, 'highlight', False)
+        self._set_tag(obj, 'highlight_color', None)
+
+    def invalidate_index(self) -> None:
+        """Discard the cached object lookups. This must be called whenever
+        objects are added to or removed from the scene after the controller
+        has been created."""
+        LOGGER.info("Action: invalidate_index()")
+        self._invalidate_caches()
+
+    def _invalidate_caches(self) -> None:
+        """Discard everything the controller has cached about the objects in
+        the scene."""
+        self._grasper_cache.clear()
+        self._grasper_bounds.clear()
+        self._rebuild_index()
+        self._highest_stable_point_dirty = True
+
+    def _index_is_current(self) -> bool:
+        """Return whether the index mapping object IDs to objects still
+        matches the objects in the scene."""
+        index = self._obj_id_index
+        indexed_count = 0
+        for obj in self._scene.objects:
+            obj_id = obj.obj_id
+            if obj_id is None:
+                continue
+            if index.get(obj_id, None) is not obj:
+                return False
+            indexed_count += 1
+        return indexed_count == len(index)
+
+    def _rebuild_index(self) -> None:
+        """Rebuild the index mapping object IDs to the objects in the
+        scene."""
+        self._obj_id_index = {obj.obj_id: obj
+                              for obj in self._scene.objects
+                              if obj.obj_id is not None}
+        self._obj_order = {obj_id: order for order, obj_id in enumerate(self._obj_id_index)}
+        self._tag_index.clear()
+        self._free_objects = None
+
+    def _get_tag_index(self, key: str) -> Optional[Dict[Any, Set[ObjectID]]]:
+        """Return the index mapping each value of the given tag to the IDs of
+        the objects having that value, building it first if necessary. If the
+        tag has unhashable values and cannot be indexed, return None."""
+        if key in self._tag_index:
+            return self._tag_index[key]
+        index: Optional[Dict[Any, Set[ObjectID]]] = {}
+        try:
+            for obj_id, obj in self._obj_id_index.items():
+                index.setdefault(obj.tags.get(key, None), set()).add(obj_id)
+        except TypeError:
+            index = None
+        self._tag_index[key] = index
+        return index
+
+    def _set_tag(self, obj: PhysicalObject, key: str, value: Any) -> None:
+        """Set the value of an object's tag, keeping the tag index up to
+        date. All modifications to tags made by the controller must go
+        through this method."""
+        index = self._tag_index.get(key, None)
+        obj_id = obj.obj_id
+        if index is not None and obj_id is not None:
+            old_ids = index.get(obj.tags.get(key, None), None)
+            if old_ids is not None:
+                old_ids.discard(obj_id)
+            try:
+                index.setdefault(value, set()).add(obj_id)
+            except TypeError:
+                # The new value can't be indexed, so neither can the tag.
+                self._tag_index[key] = None
+        if key == 'grasped_by':
+            self._free_objects = None
+        obj.set_tag(key, value)
 
     def _get_specific_grasper(self, grasper_id: ObjectID) -> Optional[PhysicalObject]:
         """Return the specific grasper indicated by the given grasper ID. If no
         such grasper exists, return None."""
-        if not isinstance(grasper_id, int):
+        if type(grasper_id) is not ObjectID and not isinstance(grasper_id, int):
             raise TypeError(grasper_id)
         if grasper_id in self._grasper_cache:
             return self._grasper_cache[grasper_id]
         grasper = self._get_specific_object(grasper_id)
         if grasper is None:
             return None
-        if grasper.tags.get('kind', None) != 'grasper':
+        if grasper.kind != 'grasper':
             raise UnmetConditionError("Object is not a grasper.")
         self._grasper_cache[grasper_id] = grasper
         if self._default_grasper is None:
             self._default_grasper = grasper
         return grasper
 
+    def _get_grasper_bounds(self, grasper: PhysicalObject) -> Tuple[float, float, float, float]:
+        """Return the limits on the grasper's position as a tuple of the form
+        (min_x, max_x, min_y, max_y). Limits which are not specified by the
+        grasper's tags are infinite."""
+        grasper_id = grasper.obj_id
+        bounds = self._grasper_bounds.get(grasper_id, None)
+        if bounds is None:
+            tags = grasper.tags
+            bounds = (tags.get('min_x', -math.inf), tags.get('max_x', math.inf),
+                      tags.get('min_y', -math.inf), tags.get('max_y', math.inf))
+            self._grasper_bounds[grasper_id] = bounds
+        return bounds
+
     def _get_grasper(self, grasper_id: ObjectID = None) -> Optional[PhysicalObject]:
         """If a grasper ID is provided, return that specific grasper.
         Otherwise, return the default grasper. If the default grasper is not
         set, set it to an arbitrary grasper first. If no graspers exist in the
         scene, or the specific grasper requested does not exist, return None."""
         if grasper_id is not None:
-            if not isinstance(grasper_id, int):
-                raise TypeError(grasper_id)
             return self._get_specific_grasper(grasper_id)
         if self._default_grasper is not None:
             return self._default_grasper
@@ -291,9 +450,17 @@ class Controller:
         set, set it to an arbitrary grasper first. If no graspers exist in the
         scene, or the specific grasper requested does not exist, raise an
         exception."""
-        if grasper_id is not None and not isinstance(grasper_id, int):
-            raise TypeError(grasper_id)
-        grasper = self._get_grasper(grasper_id)
+        # Nearly every public method passes through here, so the common cases -- the default
+        # grasper, or a grasper that has already been looked up -- are handled directly before
+        # falling back on the general lookup.
+        if grasper_id is None:
+            grasper = self._default_grasper
+        else:
+            if type(grasper_id) is not ObjectID and not isinstance(grasper_id, int):
+                raise TypeError(grasper_id)
+            grasper = self._grasper_cache.get(grasper_id, None)
+        if grasper is None:
+            grasper = self._get_grasper(grasper_id)
         if grasper is None:
             raise UnmetConditionError('Grasper not found.')
         return grasper
@@ -301,52 +468,74 @@ class Controller:
     def _get_specific_object(self, obj_id: ObjectID) -> Optional[PhysicalObject]:
         """Return the specific object indicated by the given object ID. If no
         such object exists, return None."""
-        if not isinstance(obj_id, int):
+        # The exact type check lets the usual case, an actual ObjectID, skip the more general
+        # isinstance() check.
+        if type(obj_id) is not ObjectID and not isinstance(obj_id, int):
             raise TypeError(obj_id)
-        for obj in self._scene.find_objects(obj_id=obj_id):
-            return obj
-        return None
+        obj = self._obj_id_index.get(obj_id, None)
+        if obj is None and not self._index_is_current():
+            # The scene has changed since the index was built, so everything cached about its
+            # objects is out of date, just as if invalidate_index() had been called. If it hasn't,
+            # the ID is simply invalid, and the caches are left alone.
+            self._invalidate_caches()
+            obj = self._obj_id_index.get(obj_id, None)
+        return obj
 
     def _require_specific_object(self, obj_id: ObjectID) -> PhysicalObject:
         """Return the specific object indicated by the given object ID. If no
         such object exists, raise an exception."""
-        if not isinstance(obj_id, int):
+        if type(obj_id) is not ObjectID and not isinstance(obj_id, int):
             raise TypeError(obj_id)
         obj = self._get_specific_object(obj_id)
         if obj is None:
             raise UnmetConditionError('Object not found.')
         return obj
 
-    def _find_object_below_grasper(self, grasper: PhysicalObject) \
-            -> Tuple[Optional[PhysicalObject], float]:
-        """Find the highest object directly below the grasper. Return a tuple
-        of the form (obj, dist), where obj is the object identified and dist is
-        the vertical distance from the grasper to the highest point of the
-        object. If no object is found below the grasper, return (None, 0)."""
-        if not isinstance(grasper, PhysicalObject):
+    def _sweep_scene(self, grasper: PhysicalObject = None) \
+            -> Tuple[Optional[PhysicalObject], float, float]:
+        """Make a single pass over the scene, finding both the highest object
+        directly below the grasper and the highest point of the highest stably
+        positioned object. Return a tuple of the form (obj, dist, height),
+        where obj is the object identified below the grasper, dist is the
+        vertical distance from the grasper to the highest point of that object,
+        and height is the height of the highest stable point. If no grasper
+        is given, or no object is found below the grasper, obj and dist will be
+        None and 0, respectively. An object is considered stably positioned if
+        it is either immovable or resting on another stably positioned
+        object."""
+        if grasper is not None and not isinstance(grasper, PhysicalObject):
             raise TypeError(grasper)
-        # Find the object the grasper is above, if any, and its height above ground level.
+        # The grasper doesn't move during the sweep, so look up its position only once.
+        grasper_position = None if grasper is None else grasper.position
         target = None
         target_height = 0
-        for obj in self._scene.objects:
-            if not (obj.tags.get('grasped_by', None) is None and
-                    obj.is_below_point(grasper.position)):
+        highest_stable = 0
+        free_objects = self._free_objects
+        if free_objects is None:
+            free_objects = tuple(obj for obj in self._scene.objects
+                                 if obj.tags.get('grasped_by', None) is None)
+            self._free_objects = free_objects
+        for obj in free_objects:
+            highest_point = obj.find_highest_point()
+            if highest_point is None:
                 continue
-            obj_height = obj.find_highest_point().z
-            if target_height <= obj_height:
+            obj_height = highest_point.z
+            if obj_height > highest_stable and obj.kind != 'grasper':
+                highest_stable = obj_height
+            # Only do the (comparatively expensive) check for whether the object is below the
+            # grasper if it could actually replace the current target.
+            if (grasper_position is not None and target_height <= obj_height and
+                    obj.is_below_point(grasper_position)):
                 target = obj
                 target_height = obj_height
-        return target, target_height
+        self._highest_stable_point = highest_stable
+        self._highest_stable_point_dirty = False
+        return target, target_height, highest_stable
 
     def _find_highest_stable_point(self) -> float:
-        """Find the highest point of the highest stably positioned object. An
-        object is considered stably positioned if it is either immovable or
-        resting on another stably positioned object."""
-        result = 0
-        for obj in self._scene.objects:
-            if obj.tags.get('kind') == 'grasper' or obj.tags.get('grasped_by', None) is not None:
-                continue
-            obj_result = obj.find_highest_point()
-            if obj_result is not None and obj_result.z > result:
-                result = obj_result.z
-        return result
+        """Find the highest point of the highest stably positioned object,
+        reusing the result of the last scene sweep if no object has been
+        grasped or released since."""
+        if self._highest_stable_point_dirty:
+            self._sweep_scene()
+        return self._highest_stable_point
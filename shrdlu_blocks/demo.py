@@ -12,7 +12,10 @@ grasper. Type `help` to get a list of commands.
 import ast
 import io
 import logging
+import re
+import sys
 import traceback
+from typing import Any
 
 import pygame.display
 from shrdlu_blocks.control import Controller
@@ -23,6 +26,35 @@ from shrdlu_blocks.viewer import Viewer
 __all__ = ['demo']
 
 
+# The names of the controller's public attributes, which are the commands accepted by the demo.
+COMMANDS = frozenset(name for name in dir(Controller) if not name.startswith('_'))
+
+# Matches decimal floating point literals, but not special values like 'nan' or 'inf'.
+FLOAT_PATTERN = re.compile(r'[-+]?(?:\d+\.\d*|\.\d+|\d+)(?:[eE][-+]?\d+)?')
+
+
+def _parse_arg(piece: str) -> Any:
+    """Parse a command argument as a Python literal if possible, or return
+    it unchanged as a string otherwise."""
+    # Nearly all arguments are plain numbers, which can be parsed far more cheaply than by
+    # ast.literal_eval().
+    try:
+        return int(piece)
+    except ValueError:
+        pass
+    if FLOAT_PATTERN.fullmatch(piece):
+        return float(piece)
+    try:
+        value = ast.literal_eval(piece)
+    except ValueError:
+        value = piece
+    if isinstance(value, str):
+        # String arguments are usually tag names or values. Interning them lets the tag lookups
+        # match the literal names used as keys by identity, rather than comparing the strings.
+        value = sys.intern(value)
+    return value
+
+
 def demo_callback(controller: Controller, command: str) -> str:
     """Parse and execute the command."""
     if command == 'exit':
@@ -33,26 +65,19 @@ def demo_callback(controller: Controller, command: str) -> str:
         print("Commands:", file=output_buffer)
         print("    help", file=output_buffer)
         print("    exit", file=output_buffer)
-        for name in dir(controller):
-            if not name.startswith('_'):
-                print("    " + name, file=output_buffer)
+        for name in sorted(COMMANDS):
+            print("    " + name, file=output_buffer)
         return output_buffer.getvalue() or None
     pieces = command.split()
     command = pieces.pop(0)
     if not command:
         return output_buffer.getvalue() or None
-    if '.' in command or command.startswith('_') or command not in dir(controller):
+    if command not in COMMANDS:
         print("ERROR: Invalid command", file=output_buffer)
         return output_buffer.getvalue() or None
     # noinspection PyBroadException
     try:
-        args = []
-        for piece in pieces:
-            try:
-                arg = ast.literal_eval(piece)
-            except ValueError:
-                arg = piece
-            args.append(arg)
+        args = [_parse_arg(piece) for piece in pieces]
         attribute = getattr(controller, command)
         if callable(attribute) or args:
             result = attribute(*args)
@@ -63,18 +88,24 @@ def demo_callback(controller: Controller, command: str) -> str:
         elif isinstance(result, str) or not hasattr(result, '__iter__'):
             print(repr(result), file=output_buffer)
         else:
-            object_count = len(list(controller.find_objects()))
-            for item in result:
-                if ('objects' in command and isinstance(item, int) and
-                        0 <= item < object_count):
-                    tags = dict(controller.iter_object_tags(ObjectID(item)))
-                    # Cheat just a little by constructing a mock object with the tags so we can use
-                    # the __str__() method it defines.
-                    # noinspection PyTypeChecker
-                    mock_obj = PhysicalObject(None, None, None, tags)
-                    print(str(mock_obj), file=output_buffer)
-                else:
-                    print(repr(item), file=output_buffer)
+            object_count = controller.object_count
+            lines = []
+            try:
+                for item in result:
+                    if ('objects' in command and isinstance(item, int) and
+                            0 <= item < object_count):
+                        tags = dict(controller.iter_object_tags(ObjectID(item)))
+                        # Cheat just a little by constructing a mock object with the tags so we can
+                        # use the __str__() method it defines.
+                        # noinspection PyTypeChecker
+                        mock_obj = PhysicalObject(None, None, None, tags)
+                        lines.append(str(mock_obj))
+                    else:
+                        lines.append(repr(item))
+            finally:
+                # Write everything at once, including any lines produced before an error.
+                if lines:
+                    output_buffer.write('\n'.join(lines) + '\n')
     except UnmetConditionError as e:
         print(e, file=output_buffer)
     except Exception:
@@ -97,13 +128,13 @@ def demo():
     screen_info = pygame.display.Info()
     screen_width = screen_info.current_w
     screen_height = screen_info.current_h
-    screen = pygame.display.set_mode((screen_width // 2, screen_height // 2))
+    screen = pygame.display.set_mode((screen_width // 2, screen_height // 2),
+                                     pygame.SCALED | pygame.DOUBLEBUF)
 
     Viewer(screen, "SHRDLU Blocks Demo", demo_callback,
            initial_output='Type "help" for a list of available commands.').run()
 
 
 if __name__ == '__main__':
-    import sys
     logging.basicConfig(stream=sys.stdout, level=logging.INFO)
     demo()
@@ -1,92 +1,130 @@
 """Functionality pertaining to the geometry of objects."""
 
+import functools
 import math
+import operator
 from abc import ABC, abstractmethod
-from typing import Tuple, TypeVar, Generic, Callable, Type, Iterator, Iterable, Union
+from typing import Tuple, TypeVar, Generic, Callable, Type, Iterator, Iterable, Union, Optional, \
+    Dict, List, Any
 
 
 __all__ = ['GeometricObject', 'Point', 'Edge', 'PolygonalSurface', 'PolygonalShape',
            'make_table', 'make_box', 'make_block', 'make_pyramid', 'make_grasper',
-           'triangle_area', 'inside_triangle']
+           'triangle_area', 'inside_triangle', 'inside_convex_polygon']
 
 
 Element = TypeVar('Element')
 Self = TypeVar('Self')
 
 
+def _apply_transform(point: 'Point', transform: Callable[['Point'], 'Point']) -> 'Point':
+    return transform(point)
+
+
+def _subtract_from(point: 'Point', other: 'Point') -> 'Point':
+    return other - point
+
+
 class GeometricObject(Generic[Element], ABC):
     """Base class for geometric objects -- points, edges, surfaces, and shapes.
 
     Geometric objects are immutable, hashable, comparable, iterable, and
     indexable."""
 
+    __slots__ = ()
+
     @classmethod
     @abstractmethod
     def _from_elements(cls: Type[Self], elements: Iterable[Element]) -> Self:
         raise NotImplementedError()
 
-    @abstractmethod
     def _get_elements(self) -> Tuple[Element, ...]:
-        raise NotImplementedError()
+        # Subclasses hold their elements in an _elements slot (or property), which the methods
+        # below read directly.
+        return self._elements
 
     def apply_elementwise_transform(self: Self, transform: Callable[[Element], Element]) -> Self:
         """Construct a new object of the same type by applying the same
         transform individually to each element."""
-        return self._from_elements(transform(element) for element in self._get_elements())
+        return self._from_elements(transform(element) for element in self._elements)
+
+    def apply_pointwise_transform(self: Self, transform: Callable[['Point'], 'Point']) -> Self:
+        """Construct a new object of the same type by applying the same
+        transform individually to each point in the object's structure. Each
+        distinct point is only transformed once, and points which are shared
+        between elements, e.g. the corners where the edges of a surface meet,
+        are also shared in the result."""
+        return self._transform_points(_apply_transform, transform, {})
+
+    def _transform_points(self: Self, function: Callable[['Point', Any], 'Point'], operand: Any,
+                          memo: Dict[int, 'Point']) -> Self:
+        # Each point is replaced with function(point, operand). Taking the operand separately lets
+        # the operators below pass functions from the operator module, rather than building a
+        # closure and paying for an extra Python call per point.
+        return self._from_elements(element._transform_points(function, operand, memo)
+                                   for element in self._elements)
 
     def iter_salient_points(self: Self) -> Iterator['Point']:
         """Iterate over the salient points in the object. Salient points are
         points that are explicitly mentioned in the object's structure, e.g.,
         the start and end of an edge."""
-        for element in self._get_elements():
+        for element in self._elements:
             yield from element.iter_salient_points()
 
     def __repr__(self) -> str:
-        return type(self).__name__ + repr(self._get_elements())
+        return type(self).__name__ + repr(self._elements)
 
     def __hash__(self) -> int:
-        return hash(self._get_elements())
+        # Geometric objects are immutable, so the hash is computed on first use and then reused.
+        result = self._hash
+        if result is None:
+            result = self._hash = hash(self._elements)
+        return result
 
     def __eq__(self, other: 'GeometricObject') -> bool:
         if type(self) != type(other):
             return NotImplemented
-        return self._get_elements() == other._get_elements()
+        if self is other:
+            return True
+        if self._hash is not None and other._hash is not None and self._hash != other._hash:
+            return False
+        return self._elements == other._elements
 
     def __ne__(self, other: 'GeometricObject') -> bool:
         return not self == other
 
     def __iter__(self) -> Iterator[Element]:
-        return iter(self._get_elements())
+        return iter(self._elements)
 
     def __len__(self) -> int:
-        return len(self._get_elements())
+        return len(self._elements)
 
     def __contains__(self, item: Element) -> bool:
-        return item in self._get_elements()
+        return item in self._elements
 
     def __getitem__(self, index: int) -> Element:
-        return self._get_elements()[index]
+        return self._elements[index]
 
     def __add__(self: Self, other: 'Point') -> Self:
-        return self.apply_elementwise_transform(lambda e: e + other)
+        return self._transform_points(operator.add, other, {})
 
     def __radd__(self: Self, other: 'Point') -> Self:
         return self.__add__(other)
 
     def __sub__(self: Self, other: 'Point') -> Self:
-        return self.apply_elementwise_transform(lambda e: e - other)
+        return self._transform_points(operator.sub, other, {})
 
     def __rsub__(self: Self, other: 'Point') -> Self:
-        return self.apply_elementwise_transform(lambda e: other - e)
+        return self._transform_points(_subtract_from, other, {})
 
     def __mul__(self: Self, other: float) -> Self:
-        return self.apply_elementwise_transform(lambda e: e * other)
+        return self._transform_points(operator.mul, other, {})
 
     def __rmul__(self: Self, other: float) -> Self:
         return self.__mul__(other)
 
     def __truediv__(self: Self, other: float) -> Self:
-        return self.apply_elementwise_transform(lambda e: e / other)
+        return self._transform_points(operator.truediv, other, {})
 
     def scale(self: Self, factor: float, center: 'Point' = None) -> Self:
         """Scale the object by the given factor. If center is provided, it is
@@ -101,11 +139,13 @@ class GeometricObject(Generic[Element], ABC):
 class Point(GeometricObject[float]):
     """An arbitrary point in 3D space."""
 
+    __slots__ = ('_x', '_y', '_z', '_hash')
+
     def __init__(self, x: float, y: float, z: float):
         self._x = x
         self._y = y
         self._z = z
-        self._elements = (x, y, z)
+        self._hash = None
 
     @property
     def x(self) -> float:
@@ -129,8 +169,10 @@ class Point(GeometricObject[float]):
     def _from_elements(cls: Type[Self], elements: Iterable[float]) -> Self:
         return Point(*elements)
 
-    def _get_elements(self) -> Tuple[float, ...]:
-        return self._elements
+    @property
+    def _elements(self) -> Tuple[float, float, float]:
+        # Points keep only their coordinate slots, and build the tuple when it's needed.
+        return self._x, self._y, self._z
 
     def iter_salient_points(self: Self) -> Iterator['Point']:
         """Iterate over the salient points in the object. Salient points are
@@ -138,35 +180,52 @@ class Point(GeometricObject[float]):
         the start and end of an edge."""
         yield self
 
+    def _transform_points(self, function: Callable[['Point', Any], 'Point'], operand: Any,
+                          memo: Dict[int, 'Point']) -> 'Point':
+        # Points are memoized by identity, which is how the shape builders share them.
+        result = memo.get(id(self), None)
+        if result is None:
+            result = memo[id(self)] = function(self, operand)
+        return result
+
+    # The arithmetic operators below read the coordinate slots directly, rather than through the
+    # public properties, since they run for every point of every transformed object.
+
     def __neg__(self) -> 'Point':
-        return Point(-self.x, -self.y, -self.z)
+        return Point(-self._x, -self._y, -self._z)
 
     def __abs__(self) -> float:
-        return math.sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
+        return math.hypot(self._x, self._y, self._z)
 
     def __add__(self, other: 'Point') -> 'Point':
         if not isinstance(other, Point):
             return NotImplemented
-        return Point(self.x + other.x, self.y + other.y, self.z + other.z)
+        return Point(self._x + other._x, self._y + other._y, self._z + other._z)
 
     def __sub__(self, other: 'Point') -> 'Point':
         if not isinstance(other, Point):
             return NotImplemented
-        return Point(self.x - other.x, self.y - other.y, self.z - other.z)
+        return Point(self._x - other._x, self._y - other._y, self._z - other._z)
+
+    def __rsub__(self, other: Any) -> 'Point':
+        # Subtracting a point from something other than a point subtracts each coordinate from it.
+        # This must not be inherited, since GeometricObject.__rsub__() subtracts each point from
+        # the operand, which would come straight back here.
+        return Point(other - self._x, other - self._y, other - self._z)
 
     def __mul__(self, other: Union[float, 'Point']) -> 'Point':
         if isinstance(other, (int, float)):
-            return Point(self.x * other, self.y * other, self.z * other)
+            return Point(self._x * other, self._y * other, self._z * other)
         elif isinstance(other, Point):
-            return Point(self.x * other.x, self.y * other.y, self.z * other.z)
+            return Point(self._x * other._x, self._y * other._y, self._z * other._z)
         else:
             return NotImplemented
 
     def __truediv__(self, other: Union[float, 'Point']) -> 'Point':
         if isinstance(other, (int, float)):
-            return Point(self.x / other, self.y / other, self.z / other)
+            return Point(self._x / other, self._y / other, self._z / other)
         elif isinstance(other, Point):
-            return Point(self.x / other.x, self.y / other.y, self.z / other.z)
+            return Point(self._x / other._x, self._y / other._y, self._z / other._z)
         else:
             return NotImplemented
 
@@ -174,10 +233,13 @@ class Point(GeometricObject[float]):
 class Edge(GeometricObject[Point]):
     """An arbitrary line segment in 3D space."""
 
+    __slots__ = ('_start', '_end', '_elements', '_hash')
+
     def __init__(self, start: Point, end: Point):
         self._start = start
         self._end = end
         self._elements = (start, end)
+        self._hash = None
 
     @property
     def start(self) -> Point:
@@ -193,9 +255,6 @@ class Edge(GeometricObject[Point]):
     def _from_elements(cls: Type[Self], elements: Iterable[Point]) -> Self:
         return Edge(*elements)
 
-    def _get_elements(self) -> Tuple[Point, Point]:
-        return self._elements
-
 
 class PolygonalSurface(GeometricObject[Edge]):
     """An arbitrary 2D polygon in 3D space.
@@ -203,204 +262,224 @@ class PolygonalSurface(GeometricObject[Edge]):
     NOTE: The coplanarity of the points is assumed rather than validated by
           this class."""
 
+    __slots__ = ('_elements', '_hash', '_bounds', '_horizontal_projection', '_horizontal_hull')
+
     def __init__(self, edges: Tuple[Edge, ...]):
-        self._edges = edges
+        self._elements = edges
+        self._hash = None
+        self._bounds: Optional[Tuple[Point, Point]] = None
+        self._horizontal_projection: Optional[Tuple[Tuple[float, float], ...]] = None
+        self._horizontal_hull: Optional[Tuple[Tuple[float, float], ...]] = None
 
     def __repr__(self) -> str:
-        return type(self).__name__ + '(' + repr(self._edges) + ')'
+        return type(self).__name__ + '(' + repr(self._elements) + ')'
 
     @property
     def edges(self) -> Tuple[Edge, ...]:
         """The edges of this surface."""
-        return self._edges
+        return self._elements
+
+    @property
+    def bounds(self) -> Optional[Tuple[Point, Point]]:
+        """The axis-aligned bounding box of the surface's salient points, as a
+        pair of points (lower, upper) holding the minimum and maximum value of
+        each coordinate. If the surface contains no salient points, this is
+        None."""
+        if self._bounds is None:
+            self._bounds = _find_bounds(self.iter_salient_points())
+        return self._bounds
+
+    @property
+    def horizontal_projection(self) -> Tuple[Tuple[float, float], ...]:
+        """The distinct (x, y) coordinates of the surface's salient points,
+        i.e. their projection onto the horizontal plane, in sorted order."""
+        if self._horizontal_projection is None:
+            self._horizontal_projection = tuple(sorted({(p.x, p.y)
+                                                        for p in self.iter_salient_points()}))
+        return self._horizontal_projection
+
+    @property
+    def horizontal_hull(self) -> Tuple[Tuple[float, float], ...]:
+        """The (x, y) coordinates of the corners of the convex hull of the
+        surface's horizontal projection, in counterclockwise order. If the
+        projection has no area, this is empty."""
+        if self._horizontal_hull is None:
+            self._horizontal_hull = _find_convex_hull(self.horizontal_projection)
+        return self._horizontal_hull
 
     @classmethod
     def _from_elements(cls: Type[Self], elements: Iterable[Edge]) -> Self:
         return PolygonalSurface(tuple(elements))
 
-    def _get_elements(self) -> Tuple[Edge, ...]:
-        return self._edges
-
 
 class PolygonalShape(GeometricObject[PolygonalSurface]):
     """An arbitrary 3D polygonal shape in 3D space.
 
     NOTE: Self-consistency is assumed rather than validated by this class."""
 
+    __slots__ = ('_elements', '_salient_points', '_bounds', '_hash')
+
     def __init__(self, surfaces: Tuple[PolygonalSurface, ...]):
-        self._surfaces = surfaces
+        self._elements = surfaces
+        self._salient_points: Optional[Tuple[Point, ...]] = None
+        self._bounds: Optional[Tuple[Point, Point]] = None
+        self._hash = None
 
     def __repr__(self) -> str:
-        return type(self).__name__ + '(' + repr(self._surfaces) + ')'
+        return type(self).__name__ + '(' + repr(self._elements) + ')'
 
     @property
     def surfaces(self) -> Tuple[PolygonalSurface, ...]:
         """The surfaces of this shape."""
-        return self._surfaces
+        return self._elements
+
+    @property
+    def salient_points(self) -> Tuple[Point, ...]:
+        """The distinct salient points of the shape, in the order they are
+        first yielded by iter_salient_points(). Like the bounding box, these
+        are computed on first access and then reused."""
+        if self._salient_points is None:
+            self._salient_points = tuple(dict.fromkeys(self.iter_salient_points()))
+        return self._salient_points
+
+    @property
+    def bounds(self) -> Optional[Tuple[Point, Point]]:
+        """The axis-aligned bounding box of the shape's salient points, as a
+        pair of points (lower, upper) holding the minimum and maximum value of
+        each coordinate. If the shape contains no salient points, this is None.
+        The bounding box is computed on first access and then reused, since
+        shapes are immutable."""
+        if self._bounds is None:
+            self._bounds = _find_bounds(self.salient_points)
+        return self._bounds
 
     @classmethod
     def _from_elements(cls: Type[Self], elements: Iterable[PolygonalSurface]) -> Self:
         return PolygonalShape(tuple(elements))
 
-    def _get_elements(self) -> Tuple[PolygonalSurface, ...]:
-        return self._surfaces
-
 
+def _find_bounds(points: Iterable[Point]) -> Optional[Tuple[Point, Point]]:
+    """Return the axis-aligned bounding box of the given points, as a pair of
+    points (lower, upper), or None if there are no points."""
+    points = list(points)
+    if not points:
+        return None
+    return (Point(min(p.x for p in points), min(p.y for p in points), min(p.z for p in points)),
+            Point(max(p.x for p in points), max(p.y for p in points), max(p.z for p in points)))
+
+
+def _find_convex_hull(points: Tuple[Tuple[float, float], ...]) -> Tuple[Tuple[float, float], ...]:
+    """Return the corners of the convex hull of the given (x, y) coordinates,
+    which must already be sorted, in counterclockwise order. If the hull has
+    no area, the result is empty."""
+    # Andrew's monotone chain algorithm.
+    def build_chain(sequence: Iterable[Tuple[float, float]]) -> List[Tuple[float, float]]:
+        chain = []
+        for px, py in sequence:
+            while len(chain) >= 2:
+                ax, ay = chain[-2]
+                bx, by = chain[-1]
+                if (bx - ax) * (py - ay) - (by - ay) * (px - ax) > 0:
+                    break
+                chain.pop()
+            chain.append((px, py))
+        return chain
+
+    lower_chain = build_chain(points)
+    upper_chain = build_chain(reversed(points))
+    hull = lower_chain[:-1] + upper_chain[:-1]
+    if len(hull) < 3:
+        return ()
+    return tuple(hull)
+
+
+# The corners of a cuboid are indexed as 4 * i + 2 * j + k, where i, j, and k are 0 for the
+# lower coordinate along the x, y, and z axes, respectively, and 1 for the upper coordinate.
+# These are the pairs of corner indices that form the cuboid's 12 edges.
+_CUBOID_EDGES = ((0, 1), (0, 2), (0, 4), (1, 3), (1, 5), (2, 3),
+                 (2, 6), (3, 7), (4, 5), (4, 6), (5, 7), (6, 7))
+
+# The indices into _CUBOID_EDGES of the edges of each of the cuboid's faces, in the order left,
+# right, front, back, bottom, top.
+_CUBOID_FACES = ((0, 1, 3, 5), (8, 9, 10, 11),
+                 (0, 2, 4, 8), (5, 6, 7, 11),
+                 (1, 2, 6, 9), (3, 4, 7, 10))
+
+# Functions which gather the edges of each face, in the same order, from the tuple of a cuboid's
+# edges.
+_CUBOID_FACE_GETTERS = tuple(operator.itemgetter(*face) for face in _CUBOID_FACES)
+
+# The corners of an axis-aligned rectangle are indexed as 2 * i + j, where i and j are 0 for the
+# lower coordinate along the x and y axes, respectively, and 1 for the upper coordinate. These are
+# the pairs of corner indices that form the rectangle's 4 edges.
+_RECTANGLE_EDGES = ((0, 1), (0, 2), (1, 3), (2, 3))
+
+
+def _make_cuboid_edges(width: float, depth: float, height: float) -> Tuple[Edge, ...]:
+    """Construct the edges of a cuboid which is centered horizontally on the
+    origin and extends upward from it."""
+    x_span = (-width / 2, width / 2)
+    y_span = (-depth / 2, depth / 2)
+    z_span = (0, height)
+    corners = [Point(x, y, z) for x in x_span for y in y_span for z in z_span]
+    return tuple(Edge(corners[index1], corners[index2]) for index1, index2 in _CUBOID_EDGES)
+
+
+def _make_rectangle_edges(width: float, depth: float) -> Tuple[Edge, ...]:
+    """Construct the edges of a horizontal rectangle centered on the
+    origin."""
+    x_span = (-width / 2, width / 2)
+    y_span = (-depth / 2, depth / 2)
+    corners = [Point(x, y, 0) for x in x_span for y in y_span]
+    return tuple(Edge(corners[index1], corners[index2]) for index1, index2 in _RECTANGLE_EDGES)
+
+
+# Shapes are immutable, so each builder keeps the shapes it has recently constructed and returns
+# the same shape again for the same arguments.
+_SHAPE_CACHE_SIZE = 64
+
+
+@functools.lru_cache(maxsize=_SHAPE_CACHE_SIZE, typed=True)
 def make_block(width: float, depth: float, height: float) -> PolygonalShape:
     """Construct a PolygonalShape representing a box (a cuboid/rectangular
     prism) and return it."""
-    left = -width / 2
-    right = width / 2
-    front = -depth / 2
-    back = depth / 2
-    top = height
-    bottom = 0
-    x_span = (left, right)
-    y_span = (front, back)
-    z_span = (bottom, top)
-    corners = []
-    for x in x_span:
-        for y in y_span:
-            for z in z_span:
-                corners.append(Point(x, y, z))
-    assert len(corners) == 8
-    edges = []
-    for index, point1 in enumerate(corners):
-        for point2 in corners[index + 1:]:
-            adjacent = sum(coord1 != coord2 for coord1, coord2 in zip(point1, point2)) == 1
-            if adjacent:
-                edges.append(Edge(point1, point2))
-    assert len(edges) == 12
-    surfaces = []
-    for x in x_span:
-        selected_edges = tuple(edge for edge in edges if edge.start[0] == edge.end[0] == x)
-        assert len(selected_edges) == 4, (x, selected_edges)
-        surface = PolygonalSurface(selected_edges)
-        surfaces.append(surface)
-    for y in y_span:
-        selected_edges = tuple(edge for edge in edges if edge.start[1] == edge.end[1] == y)
-        assert len(selected_edges) == 4
-        surface = PolygonalSurface(selected_edges)
-        surfaces.append(surface)
-    for z in z_span:
-        selected_edges = tuple(edge for edge in edges if edge.start[2] == edge.end[2] == z)
-        assert len(selected_edges) == 4
-        surface = PolygonalSurface(selected_edges)
-        surfaces.append(surface)
-    assert len(surfaces) == 6
-    return PolygonalShape(tuple(surfaces))
+    edges = _make_cuboid_edges(width, depth, height)
+    return PolygonalShape(tuple(PolygonalSurface(get_face(edges))
+                                for get_face in _CUBOID_FACE_GETTERS))
 
 
+@functools.lru_cache(maxsize=_SHAPE_CACHE_SIZE, typed=True)
 def make_box(width: float, depth: float, height: float) -> PolygonalShape:
     """Construct a PolygonalShape representing an open-topped box (a
     cuboid/rectangular prism minus the top surface) and return it."""
-    left = -width / 2
-    right = width / 2
-    front = -depth / 2
-    back = depth / 2
-    top = height
-    bottom = 0
-    x_span = (left, right)
-    y_span = (front, back)
-    z_span = (bottom, top)
-    corners = []
-    for x in x_span:
-        for y in y_span:
-            for z in z_span:
-                corners.append(Point(x, y, z))
-    assert len(corners) == 8
-    edges = []
-    for index, point1 in enumerate(corners):
-        for point2 in corners[index + 1:]:
-            adjacent = sum(coord1 != coord2 for coord1, coord2 in zip(point1, point2)) == 1
-            if adjacent:
-                edges.append(Edge(point1, point2))
-    assert len(edges) == 12
-    surfaces = []
-    for x in x_span:
-        selected_edges = tuple(edge for edge in edges if edge.start[0] == edge.end[0] == x)
-        assert len(selected_edges) == 4
-        surface = PolygonalSurface(selected_edges)
-        surfaces.append(surface)
-    for y in y_span:
-        selected_edges = tuple(edge for edge in edges if edge.start[1] == edge.end[1] == y)
-        assert len(selected_edges) == 4
-        surface = PolygonalSurface(selected_edges)
-        surfaces.append(surface)
-    selected_edges = tuple(edge for edge in edges if edge.start[2] == edge.end[2] == bottom)
-    assert len(selected_edges) == 4
-    surface = PolygonalSurface(selected_edges)
-    surfaces.append(surface)
-    assert len(surfaces) == 5
-    return PolygonalShape(tuple(surfaces))
+    edges = _make_cuboid_edges(width, depth, height)
+    return PolygonalShape(tuple(PolygonalSurface(get_face(edges))
+                                for get_face in _CUBOID_FACE_GETTERS[:-1]))
 
 
+@functools.lru_cache(maxsize=_SHAPE_CACHE_SIZE, typed=True)
 def make_pyramid(width: float, depth: float, height: float) -> PolygonalShape:
     """Construct a PolygonalShape representing a rectangular pyramid and return
     it."""
-    left = -width / 2
-    right = width / 2
-    front = -depth / 2
-    back = depth / 2
-    top = height
-    bottom = 0
-    x_span = (left, right)
-    y_span = (front, back)
-    bottom_corners = []
-    for x in x_span:
-        for y in y_span:
-            bottom_corners.append(Point(x, y, bottom))
-    assert len(bottom_corners) == 4
-    peak = Point(sum(x_span) / 2, sum(y_span) / 2, top)
-    bottom_edges = []
-    for index, point1 in enumerate(bottom_corners):
-        for point2 in bottom_corners[index + 1:]:
-            adjacent = sum(coord1 != coord2 for coord1, coord2 in zip(point1, point2)) == 1
-            if adjacent:
-                bottom_edges.append(Edge(point1, point2))
-    assert len(bottom_edges) == 4
+    bottom_edges = _make_rectangle_edges(width, depth)
+    peak = Point(0.0, 0.0, height)
+    # Each corner of the base is the start of exactly one of the bottom edges listed below.
+    bottom_corners = (bottom_edges[0].start, bottom_edges[0].end,
+                      bottom_edges[3].start, bottom_edges[3].end)
     side_edges = [Edge(corner, peak) for corner in bottom_corners]
-    assert len(side_edges) == 4
-    bottom_surface = PolygonalSurface(tuple(bottom_edges))
-    side_surfaces = []
-    for bottom_edge in bottom_edges:
-        edges = [bottom_edge]
-        for side_edge in side_edges:
-            if side_edge.start in bottom_edge:
-                edges.append(side_edge)
-        assert len(edges) == 3
-        side_surface = PolygonalSurface(tuple(edges))
-        side_surfaces.append(side_surface)
-    assert len(side_surfaces) == 4
-    return PolygonalShape(tuple([bottom_surface] + side_surfaces))
+    side_surfaces = [PolygonalSurface((bottom_edge, side_edges[index1], side_edges[index2]))
+                     for bottom_edge, (index1, index2) in zip(bottom_edges, _RECTANGLE_EDGES)]
+    return PolygonalShape(tuple([PolygonalSurface(bottom_edges)] + side_surfaces))
 
 
+@functools.lru_cache(maxsize=_SHAPE_CACHE_SIZE, typed=True)
 def make_table(width: float, depth: float) -> PolygonalShape:
     """Construct a PolygonalShape representing the surface of a table (i.e. a
     flat rectangular surface) and return it."""
-    left = -width / 2
-    right = width / 2
-    front = -depth / 2
-    back = depth / 2
-    bottom = 0
-    x_span = (left, right)
-    y_span = (front, back)
-    corners = []
-    for x in x_span:
-        for y in y_span:
-            corners.append(Point(x, y, bottom))
-    assert len(corners) == 4
-    edges = []
-    for index, point1 in enumerate(corners):
-        for point2 in corners[index + 1:]:
-            adjacent = sum(coord1 != coord2 for coord1, coord2 in zip(point1, point2)) == 1
-            if adjacent:
-                edges.append(Edge(point1, point2))
-    assert len(edges) == 4, edges
-    surface = PolygonalSurface(tuple(edges))
-    return PolygonalShape((surface,))
+    return PolygonalShape((PolygonalSurface(_make_rectangle_edges(width, depth)),))
 
 
+@functools.lru_cache(maxsize=_SHAPE_CACHE_SIZE, typed=True)
 def make_grasper(width: float, height: float) -> PolygonalShape:
     """Construct a PolygonalShape representing a grasper (a mechanical 'hand'
     suspended from a rod or wire) and return it."""
@@ -429,23 +508,86 @@ def make_grasper(width: float, height: float) -> PolygonalShape:
     )
 
 
+def _triangle_area(ax: float, ay: float, az: float,
+                   bx: float, by: float, bz: float,
+                   cx: float, cy: float, cz: float) -> float:
+    """Return the area of the triangle formed by the points (ax, ay, az),
+    (bx, by, bz), and (cx, cy, cz)."""
+    abx = bx - ax
+    aby = by - ay
+    abz = bz - az
+    acx = cx - ax
+    acy = cy - ay
+    acz = cz - az
+    return 0.5 * math.hypot(aby * acz - abz * acy,
+                            abz * acx - abx * acz,
+                            abx * acy - aby * acx)
+
+
 def triangle_area(triangle: Tuple[Point, Point, Point]) -> float:
     """Return the area of a triangle formed by three points in 3D space."""
     a, b, c = triangle
-    ab = b - a
-    ac = c - a
-    return 0.5 * math.sqrt((ab.y * ac.z - ab.z * ac.y) ** 2 +
-                           (ab.z * ac.x - ab.x * ac.z) ** 2 +
-                           (ab.x * ac.y - ab.y * ac.x) ** 2)
+    return _triangle_area(a.x, a.y, a.z, b.x, b.y, b.z, c.x, c.y, c.z)
 
 
 def inside_triangle(point: Point, triangle: Tuple[Point, Point, Point],
                     tolerance: float = 0.001) -> bool:
     """Return whether the given 3D point falls on (or close to) a triangle in
     3D space."""
-    abc_area = triangle_area(triangle)
+    # This is called for many triangles in a row, so the coordinates are handled directly rather
+    # than creating intermediate Points.
     a, b, c = triangle
-    pbc_area = triangle_area((point, b, c))
-    apc_area = triangle_area((a, point, c))
-    abp_area = triangle_area((a, b, point))
+    ax, ay, az = a.x, a.y, a.z
+    bx, by, bz = b.x, b.y, b.z
+    cx, cy, cz = c.x, c.y, c.z
+    px, py, pz = point.x, point.y, point.z
+    abc_area = _triangle_area(ax, ay, az, bx, by, bz, cx, cy, cz)
+    pbc_area = _triangle_area(px, py, pz, bx, by, bz, cx, cy, cz)
+    apc_area = _triangle_area(ax, ay, az, px, py, pz, cx, cy, cz)
+    abp_area = _triangle_area(ax, ay, az, bx, by, bz, px, py, pz)
     return abc_area * (1 + tolerance) >= pbc_area + apc_area + abp_area
+
+
+def _horizontal_triangle_area(ax: float, ay: float, bx: float, by: float,
+                              cx: float, cy: float) -> float:
+    """Return the area of the triangle formed by the 2D points (ax, ay),
+    (bx, by), and (cx, cy). This is exactly the area _triangle_area() gives
+    for the same points with a z coordinate of zero."""
+    return 0.5 * abs((bx - ax) * (cy - ay) - (by - ay) * (cx - ax))
+
+
+def inside_convex_polygon(x: float, y: float, corners: Tuple[Tuple[float, float], ...],
+                          tolerance: float = 0.001) -> bool:
+    """Return whether the 2D point (x, y) falls within (or close to) a convex
+    polygon whose corners are given as (x, y) coordinates in counterclockwise
+    order. A point outside the polygon is accepted if inside_triangle() would
+    accept it for some triangle formed by three of the corners, with the same
+    tolerance."""
+    if len(corners) < 3:
+        return False
+    # The point is inside if it is to the left of (or on) every edge.
+    previous_x, previous_y = corners[-1]
+    for corner_x, corner_y in corners:
+        if ((corner_x - previous_x) * (y - previous_y) -
+                (corner_y - previous_y) * (x - previous_x) < 0):
+            break
+        previous_x = corner_x
+        previous_y = corner_y
+    else:
+        return True
+    # Otherwise, fall back on testing each triangle over the corners, which is rarely needed since
+    # callers reject points outside the polygon's bounding box first.
+    count = len(corners)
+    for index1 in range(count):
+        ax, ay = corners[index1]
+        for index2 in range(index1 + 1, count):
+            bx, by = corners[index2]
+            for index3 in range(index2 + 1, count):
+                cx, cy = corners[index3]
+                abc_area = _horizontal_triangle_area(ax, ay, bx, by, cx, cy)
+                pbc_area = _horizontal_triangle_area(x, y, bx, by, cx, cy)
+                apc_area = _horizontal_triangle_area(ax, ay, x, y, cx, cy)
+                abp_area = _horizontal_triangle_area(ax, ay, bx, by, x, y)
+                if abc_area * (1 + tolerance) >= pbc_area + apc_area + abp_area:
+                    return True
+    return False
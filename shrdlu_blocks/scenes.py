@@ -3,9 +3,9 @@ simulated environment."""
 
 import time
 from dataclasses import dataclass
-from typing import Tuple, Dict, Any, Optional, Iterator
+from typing import Tuple, Dict, Any, Optional, Iterator, List
 
-from shrdlu_blocks.geometry import PolygonalShape, Point, inside_triangle, make_grasper, \
+from shrdlu_blocks.geometry import PolygonalShape, Point, inside_convex_polygon, make_grasper, \
     make_table, make_block, make_pyramid, make_box
 from shrdlu_blocks.typedefs import ObjectID, Color
 
@@ -13,10 +13,37 @@ from shrdlu_blocks.typedefs import ObjectID, Color
 __all__ = ['PhysicalObject', 'Scene', 'make_standard_scene']
 
 
+# Maps the well-known tags that are mirrored by PhysicalObject attributes to the values the
+# attributes take when the tags are absent. Each attribute has the same name as its tag.
+_TAG_ATTRIBUTES: Dict[str, Any] = {
+    'kind': None,
+    'obj_id': None,
+    'graspable': False,
+}
+
+# The well-known tags which always have boolean values.
+_BOOLEAN_TAGS = frozenset(['can_support', 'graspable', 'closed', 'lowered', 'highlight'])
+
+
+def _is_within_bounds(x: float, y: float, bounds: Optional[Tuple[Point, Point]]) -> bool:
+    """Return whether the horizontal coordinates (x, y) fall within the given
+    bounding box, if any. Since inside_convex_polygon() tolerates points that
+    fall slightly outside a polygon, the box is padded by a matching margin."""
+    if bounds is None:
+        return False
+    lower, upper = bounds
+    margin = 0.001 * max(upper.x - lower.x, upper.y - lower.y)
+    return (lower.x - margin <= x <= upper.x + margin and
+            lower.y - margin <= y <= upper.y + margin)
+
+
 @dataclass
 class PhysicalObject:
     """A physical object that can appear within a scene."""
 
+    __slots__ = ('shape', 'color', 'position', 'tags', 'kind', 'obj_id', 'graspable',
+                 '_highest_point_cache')
+
     # The shape of the object. Points in the shape are positioned relative to
     # the shape's center of mass.
     shape: PolygonalShape
@@ -27,72 +54,123 @@ class PhysicalObject:
     # The position of the object's center of mass within the scene.
     position: Point
 
-    # Metadata attached to the object.
+    # Metadata attached to the object. Tags must be modified via set_tag(),
+    # rather than directly, so the attributes mirroring them stay current.
     tags: Dict[str, Any]
 
+    def __post_init__(self):
+        # The values of the well-known tags which are consulted most often, held as attributes so
+        # they can be read without a dictionary lookup. These are kept in sync by set_tag().
+        self.kind: Optional[str] = None
+        self.obj_id: Optional[ObjectID] = None
+        self.graspable: bool = False
+        if self.tags:
+            for key, default in _TAG_ATTRIBUTES.items():
+                setattr(self, key, self.tags.get(key, default))
+        # The (position, shape, kind, highest point) from the last call to find_highest_point().
+        # Points and shapes are immutable, so the cached result remains valid for as long as both
+        # are still the identical objects and the kind is unchanged.
+        self._highest_point_cache: Optional[Tuple[Point, PolygonalShape, Optional[str],
+                                                  Optional[Point]]] = None
+
     def __str__(self) -> str:
         kind = 'object'
         obj_id = None
         attributes = []
-        for key, value in sorted(self.tags.items()):
+        # Tags are listed in the order they were added.
+        for key, value in self.tags.items():
             if key == 'kind':
                 kind = value
             elif key == 'obj_id':
                 obj_id = value
-            elif isinstance(value, bool):
+            elif key in _BOOLEAN_TAGS or isinstance(value, bool):
                 if value:
                     attributes.append(key)
             elif isinstance(value, str):
                 if value not in attributes:
                     attributes.append(value)
             elif value is not None:
-                attributes.append('%s=%r' % (key, value))
+                attributes.append(f'{key}={value!r}')
         if obj_id is None:
-            return kind + '[' + ','.join(attributes) + ']'
+            return f"{kind}[{','.join(attributes)}]"
         else:
-            return kind + '#' + str(obj_id) + '[' + ','.join(attributes) + ']'
+            return f"{kind}#{obj_id}[{','.join(attributes)}]"
+
+    def set_tag(self, key: str, value: Any) -> None:
+        """Set the value of one of the object's tags."""
+        self.tags[key] = value
+        if key in _TAG_ATTRIBUTES:
+            setattr(self, key, value)
 
     def find_highest_point(self) -> Optional[Point]:
         """Return the highest salient point of the object, or None if the
         object contains no salient points."""
-        if self.tags.get('kind', None) == 'box':
+        position = self.position
+        shape = self.shape
+        kind = self.kind
+        cache = self._highest_point_cache
+        if cache is not None and cache[0] is position and cache[1] is shape and cache[2] == kind:
+            return cache[3]
+        if kind == 'box':
             # Boxes get special treatment. We ignore their sides.
-            highest_point = self.position
+            highest_point = position
         else:
-            highest_point = max(self.shape.iter_salient_points(), key=lambda p: p.z, default=None)
-        if highest_point is None:
-            return None
-        return self.position + highest_point
+            highest_point = max(shape.salient_points, key=lambda p: p.z, default=None)
+        if highest_point is not None:
+            highest_point = position + highest_point
+        self._highest_point_cache = (position, shape, kind, highest_point)
+        return highest_point
 
     def is_below_point(self, point: Point) -> bool:
         """Return whether any part of the object is directly underneath the
         given point."""
         relative_position = point - self.position
-        point_projection = Point(relative_position.x, relative_position.y, 0)
+        x = relative_position.x
+        y = relative_position.y
+        # Reject points outside the shape's bounding box before testing individual surfaces.
+        if not _is_within_bounds(x, y, self.shape.bounds):
+            return False
         for surface in self.shape.surfaces:
-            surface_projection = sorted({Point(p.x, p.y, 0) for p in surface.iter_salient_points()},
-                                        key=lambda p: tuple(p))
-            # Find any triangle that contains the point.
-            for index1, a in enumerate(surface_projection):
-                for index2 in range(index1 + 1, len(surface_projection)):
-                    b = surface_projection[index2]
-                    for index3 in range(index2 + 1, len(surface_projection)):
-                        c = surface_projection[index3]
-                        if inside_triangle(point_projection, (a, b, c)):
-                            return True
+            if not _is_within_bounds(x, y, surface.bounds):
+                continue
+            if inside_convex_polygon(x, y, surface.horizontal_hull):
+                return True
         return False
 
+    def _is_below_points(self, points: List[Tuple[float, float]]) -> bool:
+        """Return whether some part of the object is directly underneath each
+        of the given (x, y) coordinates, which are relative to the object's
+        position. This does the same work as is_below_point() for many
+        points at once."""
+        shape_bounds = self.shape.bounds
+        if not all(_is_within_bounds(x, y, shape_bounds) for x, y in points):
+            return False
+        # Each surface only needs to be checked against the points that no earlier surface was
+        # found to be below.
+        remaining = points
+        for surface in self.shape.surfaces:
+            if not remaining:
+                break
+            surface_bounds = surface.bounds
+            hull = surface.horizontal_hull
+            remaining = [(x, y) for x, y in remaining
+                         if not (_is_within_bounds(x, y, surface_bounds) and
+                                 inside_convex_polygon(x, y, hull))]
+        return not remaining
+
     def can_support(self, obj: 'PhysicalObject') -> bool:
         """Return whether this object can support the other given their current
         (x, y) coordinates. (The relative elevation, z, is ignored.)"""
         if not self.tags.get('can_support', False):
             return False
-        kind = self.tags.get('kind', None)
-        if kind == 'box':
+        if self.kind == 'box':
             # Boxes get special treatment; we cannot set something down if it would land on the side
             # of the box.
-            return all(self.is_below_point(obj.position + point)
-                       for point in obj.shape.iter_salient_points())
+            offset = obj.position - self.position
+            offset_x = offset.x
+            offset_y = offset.y
+            return self._is_below_points([(offset_x + point.x, offset_y + point.y)
+                                          for point in obj.shape.salient_points])
         return self.is_below_point(obj.position)
 
 
@@ -220,10 +298,10 @@ def make_standard_scene() -> Scene:
         wide_blue_pyramid,
     ]
     for index, obj in enumerate(objects):
-        obj.tags['obj_id'] = ObjectID(index)
+        obj.set_tag('obj_id', ObjectID(index))
     for obj in objects:
         resting_on = obj.tags.get('resting_on', None)
         if resting_on is not None:
             assert isinstance(resting_on, PhysicalObject)
-            obj.tags['resting_on'] = resting_on.tags['obj_id']
+            obj.set_tag('resting_on', resting_on.obj_id)
     return Scene(tuple(objects), dict(created=time.time()))
@@ -1,16 +1,20 @@
 """Functionality for viewing and interacting with a scene."""
+import functools
 import logging
+import operator
+import queue
 import textwrap
 import threading
 import time
 import typing
-from collections import deque
-from typing import Optional, Tuple, Callable, List, Any
+from collections import OrderedDict, deque
+from typing import Optional, Tuple, Callable, List, Any, Dict
 
 import pygame.display
+import pygame.gfxdraw
 from shrdlu_blocks.control import Controller
-from shrdlu_blocks.geometry import Point
-from shrdlu_blocks.scenes import Scene, make_standard_scene
+from shrdlu_blocks.geometry import Point, Edge, PolygonalSurface
+from shrdlu_blocks.scenes import PhysicalObject, Scene, make_standard_scene
 from shrdlu_blocks.typedefs import Color
 
 __all__ = ['Viewer']
@@ -21,6 +25,90 @@ LOGGER = logging.getLogger(__name__)
 
 ResponseCallback = Callable[[Controller, str], str]
 
+# The maximum number of rendered lines of text the viewer keeps for reuse.
+RENDERED_LINE_CACHE_SIZE = 512
+
+# The maximum number of wrapped text layouts the viewer keeps for reuse.
+WRAPPED_TEXT_CACHE_SIZE = 16
+
+# How long, in milliseconds, the viewer waits for an event while the displayed frame is current,
+# before checking for other changes to the scene.
+IDLE_MILLISECONDS = 16
+
+# The maximum number of inputs the viewer holds until they are retrieved with get_input().
+INPUT_QUEUE_SIZE = 64
+
+# The maximum number of outputs the viewer holds until they are displayed.
+OUTPUT_QUEUE_SIZE = 64
+
+
+def _put_bounded(bounded_queue: queue.Queue, item: str, description: str) -> None:
+    """Put the item in the bounded queue, first discarding the oldest items
+    in the queue if there is no room for it."""
+    while True:
+        try:
+            bounded_queue.put_nowait(item)
+            return
+        except queue.Full:
+            try:
+                discarded = bounded_queue.get_nowait()
+            except queue.Empty:
+                continue
+            LOGGER.warning("The %s queue is full. Discarding the oldest %s:\n%s",
+                           description, description, discarded)
+
+
+@functools.lru_cache()
+def _get_highlight_color(color: Color) -> Color:
+    """Return the color to flash an object of the given color with when it is
+    highlighted: the corner of the color cube which is furthest from it."""
+    r, g, b = color
+    return Color(255 * (r < 128), 255 * (g < 128), 255 * (b < 128))
+
+
+def _wrap_lines(lines: List[str], line_width: int) -> List[str]:
+    """Wrap each of the lines to the given number of characters, and return
+    all of the wrapped lines together."""
+    wrapped_lines = []
+    for original_line in lines:
+        wrapped_lines.extend(textwrap.wrap(original_line, width=line_width))
+    return wrapped_lines
+
+
+def _get_depth_key(points: List[Tuple[float, float, float]]) -> Tuple[Tuple[float, ...], ...]:
+    """Return the key to sort polygons by, given their points in view
+    coordinates, so that those with greater keys are drawn first, i.e. are
+    treated as further away. Polygons are compared point by point, furthest
+    first."""
+    # Cheaper keys that only look at the furthest point and the centroid order the fills the same
+    # way, but not the outlines of faces which reach equally far, like the sides and bottom of a
+    # block, so hidden edges show through. Keys are only computed when an object is projected
+    # again, not on every frame, so the exact key costs little.
+    return tuple(sorted(((y, -x, -z) for x, y, z in points), reverse=True))
+
+
+def _trace_outline(edges: Tuple[Edge, ...]) -> List[Point]:
+    """Return the points visited by walking the edges of a surface in order,
+    starting and ending at the same point if the edges form a closed loop."""
+    first_edge = edges[0]
+    points = [first_edge.start, first_edge.end]
+    if len(edges) == 1:
+        return points
+    # Map each point to the points it shares an edge with, so the walk can look up the next
+    # point directly instead of searching the remaining edges for it.
+    neighbors: Dict[Point, List[Point]] = {}
+    for edge in edges:
+        neighbors.setdefault(edge.start, []).append(edge.end)
+        neighbors.setdefault(edge.end, []).append(edge.start)
+    previous, current = points
+    for _ in range(len(edges) - 1):
+        candidates = neighbors[current]
+        assert len(candidates) == 2, candidates
+        following = candidates[1] if candidates[0] == previous else candidates[0]
+        points.append(following)
+        previous, current = current, following
+    return points
+
 
 class Viewer:
     """An interactive scene viewer.
@@ -33,7 +121,7 @@ class Viewer:
     """
 
     def __init__(self, screen, title: str = None, callback: ResponseCallback = None,
-                 initial_output: str = None):
+                 initial_output: str = None, scene: Scene = None):
         self._screen = screen
         self._width = self._screen.get_width()
         self._height = self._screen.get_height()
@@ -51,11 +139,16 @@ class Viewer:
         self._wall_color = Color(255, 255, 255)
         self._y_to_x_bleed_rate = 0.2
         self._y_to_z_bleed_rate = 0.2
+        # The pre-filled background the scene is drawn over. See _get_background().
+        self._background: Any = None
 
         if title:
             pygame.display.set_caption(title)
 
-        self._scene: Optional[Scene] = make_standard_scene()
+        # The standard scene is only built if no other scene was provided.
+        if scene is None:
+            scene = make_standard_scene()
+        self._scene: Optional[Scene] = scene
         self._controller = Controller(self._scene)
 
         self._text_height = 25
@@ -71,11 +164,49 @@ class Viewer:
         self._input_text = ''
         self._input_enabled = True
 
+        # Rendering text is expensive, and the same text is usually drawn on every frame, so
+        # rendered lines and wrapped layouts are kept in LRU caches.
+        self._rendered_line_cache: 'OrderedDict[Tuple[str, Tuple[int, ...]], Any]' = OrderedDict()
+        self._wrapped_text_cache: 'OrderedDict[Tuple[str, Tuple[int, ...], int], Any]' = \
+            OrderedDict()
+
+        # The layout of each text box as of the last time it was drawn, as the (surface, position)
+        # of each line, ready to be passed to Surface.blits(), along with what it was computed
+        # from.
+        self._input_layout_key: Any = None
+        self._input_layout: List[Tuple[Any, Tuple[int, int]]] = []
+        self._output_layout_key: Any = None
+        self._output_layout: List[Tuple[Any, Tuple[int, int]]] = []
+
+        # The outline of each surface drawn so far, as a list of points in drawing order.
+        self._outline_cache: Dict[PolygonalSurface, List[Point]] = {}
+
+        # The most recent projection of each object onto the screen, keyed by the object's id,
+        # along with what it was computed from. See _project_object().
+        self._projection_cache: Dict[int, Tuple[Any, ...]] = {}
+
         self._highlight_flash_seconds = 0.5
 
-        self._input_available = threading.Event()
-        self._input_queue = deque()
-        self._output_queue = deque()
+        # Whether the displayed frame is out of date and needs to be redrawn, and the state of the
+        # scene as of the last check, which is compared against to detect changes made to the scene
+        # through the controller.
+        self._dirty = True
+        self._last_scene_state: Any = None
+
+        # Inputs stay in the input queue until they are retrieved, so waiting for an input doesn't
+        # take it away from anyone else waiting for one. The condition guards the input queue,
+        # and every thread waiting on it is woken when an input arrives. The output queue takes
+        # care of its own locking and signalling. Both queues are bounded, and the oldest item is
+        # dropped to make room if one fills up. See _put_input() and _put_bounded().
+        self._input_queue: 'typing.Deque[str]' = deque(maxlen=INPUT_QUEUE_SIZE)
+        self._input_condition = threading.Condition()
+        self._output_queue: 'queue.Queue[str]' = queue.Queue(OUTPUT_QUEUE_SIZE)
+
+        # Inputs are passed to the callback by a single worker thread, rather than by a new thread
+        # for each input. The worker is only started once there is an input for it, and is
+        # started again if it has stopped. See _submit_work().
+        self._work_queue: 'queue.SimpleQueue[str]' = queue.SimpleQueue()
+        self._worker: Optional[threading.Thread] = None
 
     @property
     def scene(self) -> Optional[Scene]:
@@ -89,6 +220,11 @@ class Viewer:
         self._controller = None if scene is None else Controller(scene)
         self._input_text = ''
         self._output_text = self._initial_output
+        self._rendered_line_cache.clear()
+        self._wrapped_text_cache.clear()
+        self._outline_cache.clear()
+        self._projection_cache.clear()
+        self._dirty = True
 
     @property
     def title(self) -> Optional[str]:
@@ -124,34 +260,40 @@ class Viewer:
 
     def wait_for_input(self, timeout: float = None) -> None:
         """Wait for an input to become available."""
-        if not self._input_queue:
-            self._input_available.wait(timeout)
-        self._input_available.clear()
+        with self._input_condition:
+            self._input_condition.wait_for(lambda: self._input_queue, timeout)
 
     def get_input(self) -> Optional[str]:
         """Get the next input from the user."""
-        if self._input_queue:
-            return self._input_queue.popleft()
-        return None
+        with self._input_condition:
+            if self._input_queue:
+                return self._input_queue.popleft()
+            return None
 
     def send_output(self, text: str) -> None:
-        """Show an output to the user."""
+        """Show an output to the user. Outputs are shown one per frame, in the
+        order they were sent. At most OUTPUT_QUEUE_SIZE outputs are held
+        waiting to be shown; if more are sent, the oldest are discarded."""
         LOGGER.info("Output received asynchronously:\n%s", text)
-        self._output_queue.append(text)
+        _put_bounded(self._output_queue, text, 'output')
 
     def move_camera(self, relative_position: Point) -> None:
         self._view_center += relative_position
+        self._dirty = True
 
     def adjust_zoom(self, relative_zoom: float) -> None:
         self._zoom *= relative_zoom
+        self._dirty = True
 
     def run(self):
         try:
             while self.handle_events():
-                self.display_scene()
-                self.display_input_text_box()
-                self.display_output_text_box()
-                pygame.display.flip()
+                if self._needs_redraw():
+                    self.display_scene()
+                    self.display_input_text_box()
+                    self.display_output_text_box()
+                    pygame.display.flip()
+                    self._dirty = False
         except pygame.error as e:
             # Silence a couple of harmless exceptions that can happen when we quit from
             # another thread.
@@ -161,93 +303,220 @@ class Viewer:
             raise
 
     def handle_events(self) -> bool:
-        for event in pygame.event.get():
+        # Keystrokes are collected and applied to the input text all at once, rather than
+        # rebuilding the text for each one. Backspaces remove typed characters that are still
+        # pending first, and then characters from the existing text.
+        typed = []
+        deleted = 0
+        if self._dirty:
+            events = pygame.event.get()
+        else:
+            # Nothing has changed since the last frame, so rather than spinning, block until an
+            # event arrives or it's time to check the scene again.
+            first_event = pygame.event.wait(IDLE_MILLISECONDS)
+            events = pygame.event.get()
+            if first_event.type != pygame.NOEVENT:
+                events.insert(0, first_event)
+        for event in events:
+            # Any event, such as a keystroke or the window being exposed, can change what should
+            # be on the screen.
+            self._dirty = True
             if event.type == pygame.QUIT:
                 return False
             elif self._scene and self._input_enabled and event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_RETURN:
-                    input_text = self._input_text
+                    input_text = self._edit_input_text(typed, deleted)
+                    typed.clear()
+                    deleted = 0
                     self._input_text = ''
                     if self._callback:
-                        thread = threading.Thread(target=self._run_callback, args=(input_text,))
-                        thread.start()
+                        self._submit_work(input_text)
                     else:
-                        self._input_queue.append(input_text)
-                        self._input_available.set()
+                        self._put_input(input_text)
                 elif event.key == pygame.K_BACKSPACE:
-                    self._input_text = self._input_text[:-1]
+                    if typed:
+                        typed.pop()
+                    else:
+                        deleted += 1
                 else:
-                    self._input_text += event.unicode
-        if self._output_queue:
-            self._output_text = self._output_queue.popleft()
+                    typed.extend(event.unicode)
+        if typed or deleted:
+            self._input_text = self._edit_input_text(typed, deleted)
+        try:
+            self._output_text = self._output_queue.get_nowait()
+        except queue.Empty:
+            pass
+        else:
+            self._dirty = True
             LOGGER.info("Displaying output:\n%s", self._output_text)
         return True
 
+    def _edit_input_text(self, typed: List[str], deleted: int) -> str:
+        text = self._input_text
+        if deleted:
+            text = text[:-deleted]
+        return text + ''.join(typed)
+
+    def _needs_redraw(self) -> bool:
+        scene_state = self._get_scene_state()
+        if scene_state != self._last_scene_state:
+            self._last_scene_state = scene_state
+            self._dirty = True
+        return self._dirty
+
+    def _get_scene_state(self) -> Any:
+        # Everything about the scene that affects how it is drawn. Positions and shapes are
+        # immutable and are replaced whenever they change, so comparing them is cheap.
+        if not self._scene:
+            return None
+        state = [(obj.position, obj.shape, obj.color, obj.tags.get('highlight', False),
+                  obj.tags.get('highlight_color', None))
+                 for obj in self._scene.objects]
+        if any(highlight for _, _, _, highlight, _ in state):
+            # Highlighted objects flash, so the frame also changes with the flash phase.
+            state.append(int(time.time() / self._highlight_flash_seconds) % 2)
+        return state
+
     def display_scene(self) -> None:
         highlighting_active = int(time.time() / self._highlight_flash_seconds) % 2
-        self._screen.fill(self._wall_color)
+        screen = self._screen
+        screen.blit(self._get_background(), (0, 0))
         if not self._scene:
             return
         polygons = []
+        offset = self._screen_center - self._view_center
+        zoom = self._zoom
+        project_object = self._project_object
         for obj in self._scene.objects:
-            transformed_shape = self._screen_center - self._view_center + \
-                                (obj.position + obj.shape) * self._zoom
             if highlighting_active and obj.tags.get('highlight', False):
                 color = obj.tags.get('highlight_color', None)
                 if color is None:
                     # If no color specified, choose a suitable one automatically.
-                    r, g, b = obj.color
-                    color = Color(255 * (r < 128), 255 * (g < 128), 255 * (b < 255))
+                    color = _get_highlight_color(obj.color)
             else:
                 color = obj.color
-            for surface in transformed_shape.surfaces:
-                remaining_edges = set(surface.edges)
-                edge = remaining_edges.pop()
-                points = [edge.start, edge.end]
-                while remaining_edges:
-                    for edge in remaining_edges:
-                        if edge.start == points[-1]:
-                            points.append(edge.end)
-                            remaining_edges.remove(edge)
-                            break
-                        elif edge.end == points[-1]:
-                            points.append(edge.start)
-                            remaining_edges.remove(edge)
-                            break
-                    else:
-                        assert not remaining_edges, remaining_edges
-                polygons.append((color, points))
-        polygons.sort(key=lambda polygon: tuple(sorted(((point.y, -point.x, -point.z)
-                                                        for point in polygon[1]),
-                                                       reverse=True)),
-                      reverse=True)
-        for color, points in polygons:
-            points = [self._map_point_to_screen(point) for point in points]
+            for depth_key, points in project_object(obj, offset, zoom):
+                polygons.append((depth_key, color, points))
+        # Painter's algorithm: Draw the polygons from back to front.
+        polygons.sort(key=operator.itemgetter(0), reverse=True)
+        # The gfxdraw functions fill and outline a polygon without going through pygame's generic
+        # polygon rasterizer, and the outline is antialiased.
+        fill_polygon = pygame.gfxdraw.filled_polygon
+        outline_polygon = pygame.gfxdraw.aapolygon
+        for _, color, points in polygons:
             if len(points) > 2:
-                pygame.draw.polygon(self._screen, color, points)
-                pygame.draw.polygon(self._screen, (0, 0, 0), points, width=1)
+                fill_polygon(screen, points, color)
+                outline_polygon(screen, points, (0, 0, 0))
             else:
                 assert len(points) == 2
-                pygame.draw.aaline(self._screen, color, points[0], points[1])
+                pygame.draw.aaline(screen, color, points[0], points[1])
+
+    def _project_object(self, obj: PhysicalObject, offset: Point,
+                        zoom: float) -> List[Tuple[Tuple[float, ...], List[Tuple[float, float]]]]:
+        # Return the depth key and screen coordinates of each of the object's surfaces. Only the
+        # objects which actually moved since the last frame, usually just the grasper, need to be
+        # projected again, so the results are cached for as long as the object's position and
+        # shape and the camera stay the same.
+        cached = self._projection_cache.get(id(obj), None)
+        if (cached is not None and cached[0] is obj and cached[1] is obj.position and
+                cached[2] is obj.shape and cached[3] == zoom and cached[4] == offset):
+            return cached[5]
+        # Everything used in the loops below is looked up once, up front, since the loops run for
+        # every point of every surface of the object.
+        position = obj.position
+        position_x, position_y, position_z = position.x, position.y, position.z
+        offset_x, offset_y, offset_z = offset.x, offset.y, offset.z
+        height = self._height
+        y_to_x_bleed_rate = self._y_to_x_bleed_rate
+        y_to_z_bleed_rate = self._y_to_z_bleed_rate
+        width = self._width
+        get_outline = self._get_outline
+        projected = []
+        # Each point is transformed into view coordinates, as (x, y, z) tuples, and from there
+        # into screen coordinates directly, rather than building a transformed copy of the whole
+        # shape, and points shared between surfaces are only transformed once.
+        transformed_points: Dict[int, Tuple[Tuple[float, float, float], Tuple[float, float]]] = {}
+        for surface in obj.shape.surfaces:
+            view_points = []
+            screen_points = []
+            for point in get_outline(surface):
+                transformed_point = transformed_points.get(id(point), None)
+                if transformed_point is None:
+                    x = (point.x + position_x) * zoom + offset_x
+                    y = (point.y + position_y) * zoom + offset_y
+                    z = (point.z + position_z) * zoom + offset_z
+                    # This is the same mapping as _map_point_to_screen(), inlined.
+                    transformed_point = transformed_points[id(point)] = (
+                        (x, y, z),
+                        (x + y_to_x_bleed_rate * y, height - (z + y_to_z_bleed_rate * y))
+                    )
+                view_points.append(transformed_point[0])
+                screen_points.append(transformed_point[1])
+            # Surfaces which lie entirely off the screen are dropped, so they are neither sorted
+            # nor drawn.
+            x_values = [x for x, _ in screen_points]
+            y_values = [y for _, y in screen_points]
+            if (max(x_values) < 0 or min(x_values) >= width or
+                    max(y_values) < 0 or min(y_values) >= height):
+                continue
+            if len(screen_points) > 2:
+                # Filled polygons are drawn with gfxdraw, which only accepts integer coordinates.
+                screen_points = [(int(x), int(y)) for x, y in screen_points]
+            projected.append((_get_depth_key(view_points), screen_points))
+        self._projection_cache[id(obj)] = (obj, position, obj.shape, zoom, offset, projected)
+        return projected
+
+    def _get_background(self) -> Any:
+        # A surface of the same size and pixel format as the screen, filled with the wall color.
+        # Blitting it is cheaper than filling the screen, which converts the color to the screen's
+        # pixel format every time. It's rebuilt if the screen has been resized.
+        background = self._background
+        if background is None or background.get_size() != self._screen.get_size():
+            background = pygame.Surface(self._screen.get_size()).convert(self._screen)
+            background.fill(self._wall_color)
+            self._background = background
+        return background
+
+    def _get_outline(self, surface: PolygonalSurface) -> List[Point]:
+        # A surface's outline doesn't change, and shapes are shared and reused, so outlines are
+        # only traced the first time each surface is drawn.
+        outline = self._outline_cache.get(surface, None)
+        if outline is None:
+            outline = self._outline_cache[surface] = _trace_outline(surface.edges)
+        return outline
 
     def display_output_text_box(self):
-        width, height, surfaces = self._wrap_text(self._output_text, self._output_text_color)
-        self._output_text_box.w = width
-        self._output_text_box.h = height
-        self._output_text_box.top = self._input_text_box.top - height
-        for cumulative_height, surface in surfaces:
-            self._screen.blit(surface, (self._output_text_box.x + 5,
-                                        self._output_text_box.y + 5 + cumulative_height))
+        # The box's layout only changes along with the text, the window width, and the position of
+        # the input box, so it is only worked out again when one of those changes.
+        key = (self._output_text, self._width, self._input_text_box.top)
+        if key != self._output_layout_key:
+            width, height, surfaces = self._wrap_text(self._output_text, self._output_text_color)
+            self._output_text_box.w = width
+            self._output_text_box.h = height
+            self._output_text_box.top = self._input_text_box.top - height
+            self._output_layout = [(surface, (self._output_text_box.x + 5,
+                                              self._output_text_box.y + 5 + cumulative_height))
+                                   for cumulative_height, surface in surfaces]
+            self._output_layout_key = key
+        self._screen.blits(self._output_layout, doreturn=False)
 
     def display_input_text_box(self):
-        width, height, surfaces = self._wrap_text(self._input_text, self._input_text_color)
-        self._input_text_box.w = width
-        self._input_text_box.h = height
-        self._input_text_box.top = self._height - height
-        self._output_text_box.top = self._input_text_box.top - self._input_text_box.h
-        for cumulative_height, surface in surfaces:
-            self._screen.blit(surface, (self._input_text_box.x + 5,
-                                        self._input_text_box.y + 5 + cumulative_height))
+        # The box's layout only changes along with the text and the window width, so it is only
+        # worked out again when one of those changes.
+        key = (self._input_text, self._width)
+        if key != self._input_layout_key:
+            width, height, surfaces = self._wrap_text(self._input_text, self._input_text_color)
+            self._input_text_box.w = width
+            self._input_text_box.h = height
+            self._input_text_box.top = self._height - height
+            self._output_text_box.top = self._input_text_box.top - self._input_text_box.h
+            self._input_layout = [(surface, (self._input_text_box.x + 5,
+                                             self._input_text_box.y + 5 + cumulative_height))
+                                  for cumulative_height, surface in surfaces]
+            self._input_layout_key = key
+            # The output box was just moved, so its layout has to be worked out again, too.
+            self._output_layout_key = None
+        self._screen.blits(self._input_layout, doreturn=False)
 
     def _map_point_to_screen(self, point: Point) -> Tuple[float, float]:
         x, y, z = point
@@ -255,23 +524,68 @@ class Viewer:
         screen_y = self._height - (z + self._y_to_z_bleed_rate * y)
         return screen_x, screen_y
 
+    def _render_line(self, line: str, color: Color) -> Any:
+        key = (line, tuple(color))
+        cache = self._rendered_line_cache
+        surface = cache.get(key, None)
+        if surface is None:
+            surface = cache[key] = self._font.render(line, True, color)
+            if len(cache) > RENDERED_LINE_CACHE_SIZE:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(key)
+        return surface
+
     def _wrap_text(self, text: str, color: Color) -> Tuple[int, int, List[Tuple[int, Any]]]:
+        # The layout depends on the window width, so it is recomputed if the window is resized.
+        key = (text, tuple(color), self._width)
+        cache = self._wrapped_text_cache
+        result = cache.get(key, None)
+        if result is None:
+            result = cache[key] = self._layout_text(text, color)
+            if len(cache) > WRAPPED_TEXT_CACHE_SIZE:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(key)
+        return result
+
+    def _layout_text(self, text: str, color: Color) -> Tuple[int, int, List[Tuple[int, Any]]]:
         lines = [line for line in text.splitlines(keepends=False) if line.strip()]
         if not lines:
             lines.append('')
-        text_surfaces = [self._font.render(line, True, color) for line in lines]
-        max_width = max((surface.get_width() for surface in text_surfaces), default=0) + 10
-
-        # Progressively reduce line width until the wrapped lines fit inside the window.
-        line_width = max((len(line) for line in lines), default=0)
-        while max_width > self._width:
-            line_width -= 1
-            text_surfaces = []
-            for original_line in lines:
-                for line in textwrap.wrap(original_line, width=line_width):
-                    text_surfaces.append(self._font.render(line, True, color))
-            max_width = max((surface.get_width() for surface in text_surfaces), default=0) + 10
-
+        # Lines are measured with Font.size(), which doesn't rasterize the glyphs, and only the
+        # lines which are finally displayed are rendered.
+        wrapped_lines = lines
+        max_width = self._measure_lines(lines)
+
+        if max_width > self._width:
+            # Rather than trying one line width after another until the wrapped lines fit inside
+            # the window, estimate the line width that fits from the average width of a
+            # character, and then correct the estimate in steps of the same scale.
+            longest_line = max(len(line) for line in lines)
+            character_width = max(1.0, (max_width - 10) / max(1, longest_line))
+            line_width = min(longest_line - 1,
+                             max(1, int((self._width - 10) / character_width)))
+            wrapped_lines = _wrap_lines(lines, line_width)
+            max_width = self._measure_lines(wrapped_lines)
+            while max_width > self._width and line_width > 1:
+                line_width = max(1, line_width -
+                                 max(1, int((max_width - self._width) / character_width)))
+                wrapped_lines = _wrap_lines(lines, line_width)
+                max_width = self._measure_lines(wrapped_lines)
+            # The estimate may have been too cautious, so use the widest line width that fits.
+            # With proportional fonts, whether the wrapped lines fit isn't strictly monotonic in
+            # the line width, so a wider line width can fit even if a narrower one doesn't, and
+            # every line width up to the point where none can fit any more is checked.
+            for wider_line_width in range(line_width + 1, self._find_wrap_limit(lines) + 1):
+                wider_lines = _wrap_lines(lines, wider_line_width)
+                wider_max_width = self._measure_lines(wider_lines)
+                if wider_max_width <= self._width:
+                    line_width = wider_line_width
+                    wrapped_lines = wider_lines
+                    max_width = wider_max_width
+
+        text_surfaces = [self._render_line(line, color) for line in wrapped_lines]
         cumulative_height = [0]
         for surface in text_surfaces:
             cumulative_height.append(cumulative_height[-1] + 5 + surface.get_height())
@@ -279,6 +593,62 @@ class Viewer:
 
         return max_width, total_height, list(zip(cumulative_height, text_surfaces))
 
+    def _find_wrap_limit(self, lines: List[str]) -> int:
+        # Return a line width beyond which the lines, once wrapped, can't fit inside the window,
+        # given that they don't fit unwrapped. A paragraph which has to be wrapped at a given line
+        # width produces a line no more than a word shorter than the line width, and that line can
+        # be no narrower than the narrowest character allows. Since kerning can bring characters
+        # closer together, a quarter of that character's width is allowed for it.
+        longest_line = max(len(line) for line in lines)
+        unwrapped_lines = _wrap_lines(lines, 8 * longest_line + 8)
+        longest_word = max((len(word) for line in unwrapped_lines for word in line.split()),
+                           default=0)
+        size = self._font.size
+        narrowest = 0.75 * min((size(character)[0]
+                                for character in set(''.join(unwrapped_lines))), default=0)
+        limit = longest_line - 1
+        if narrowest > 0:
+            limit = min(limit, int((self._width - 10) / narrowest) + longest_word + 1)
+        # No paragraph has to be wrapped at line widths past the longest of them, and the wrapped
+        # lines there are the same as at that width, so it's enough to check up to it.
+        return min(limit, max((len(line) for line in unwrapped_lines), default=0))
+
+    def _measure_lines(self, lines: List[str]) -> int:
+        # Return the width of the widest of the lines, including the box's margins.
+        size = self._font.size
+        return max((size(line)[0] for line in lines), default=0) + 10
+
+    def _put_input(self, input_text: str) -> None:
+        # Add the input to the input queue, discarding the oldest input if there's no room for it,
+        # and wake every thread waiting for an input.
+        with self._input_condition:
+            if len(self._input_queue) == self._input_queue.maxlen:
+                LOGGER.warning("The input queue is full. Discarding the oldest input:\n%s",
+                               self._input_queue[0])
+            self._input_queue.append(input_text)
+            self._input_condition.notify_all()
+
+    def _submit_work(self, input_text: str) -> None:
+        self._work_queue.put(input_text)
+        worker = self._worker
+        if worker is None or not worker.is_alive():
+            worker = self._worker = threading.Thread(target=self._worker_loop, daemon=True)
+            worker.start()
+
+    def _worker_loop(self) -> None:
+        while True:
+            input_text = self._work_queue.get()
+            # One input's failure mustn't stop the worker from handling the ones after it.
+            # Exiting is the exception, since a callback only does that deliberately, and the
+            # next input will start a new worker.
+            # noinspection PyBroadException
+            try:
+                self._run_callback(input_text)
+            except SystemExit:
+                raise
+            except BaseException:
+                LOGGER.exception("Error in callback:")
+
     def _run_callback(self, input_text: str) -> None:
         self._input_enabled = False
         for line in input_text.splitlines(keepends=False):
@@ -294,7 +664,7 @@ class Viewer:
             else:
                 LOGGER.info('Output received synchronously:\n%s', output_text)
             if output_text is not None:
-                self._output_queue.append(output_text)
+                _put_bounded(self._output_queue, output_text, 'output')
         except Exception:
             LOGGER.exception("Error in callback:")
         finally: